@@ -3,15 +3,23 @@ SKANEM INTERLABELS AFRICA - HELPDESK SYSTEM
 Production Version with ML Priority Prediction
 """
 
-from flask import Flask, render_template, request, jsonify, session, redirect, url_for
-from flask_socketio import SocketIO, emit
+from flask import Flask, render_template, request, jsonify, session, redirect, url_for, g
+from flask_socketio import SocketIO, emit, join_room
 import sqlite3
 from datetime import datetime
 import joblib
 import os
+import re
 import json
+import time
+import hashlib
 from functools import wraps
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from db_pool import SQLiteConnectionPool, SQLiteWriter
 import bcrypt
+import numpy as np
+from scipy.sparse import csr_matrix
 
 # =============================================================================
 # APPLICATION CONFIGURATION
@@ -20,8 +28,43 @@ import bcrypt
 app = Flask(__name__)
 app.secret_key = os.environ.get('SECRET_KEY', 'demo-secret-key-change-in-production')
 
+# Use orjson for JSON serialization when available (~3-5x faster than
+# stdlib json for the dict-heavy ticket API responses). jsonify() picks
+# this up automatically; stdlib json remains the fallback.
+try:
+    import orjson
+    from flask.json.provider import JSONProvider
+
+    class ORJSONProvider(JSONProvider):
+        def dumps(self, obj, **kwargs):
+            # OPT_SERIALIZE_NUMPY: confidence scores are numpy floats
+            return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY).decode('utf-8')
+
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+
+    app.json = ORJSONProvider(app)
+    print("✓ orjson JSON provider enabled")
+except ImportError:
+    pass
+
 # Initialize Socket.IO
-socketio = SocketIO(app, cors_allowed_origins="*")
+# With multiple gunicorn workers, a message queue (Redis) is needed so
+# emits reach clients connected to other workers. Without one, scaling
+# out silently drops notifications for clients on other workers, so
+# refuse to start in that configuration rather than degrade.
+if int(os.environ.get('WEB_CONCURRENCY', '1')) > 1 and not os.environ.get('REDIS_URL'):
+    raise RuntimeError(
+        "WEB_CONCURRENCY > 1 requires REDIS_URL: without a Socket.IO "
+        "message queue, emits only reach clients connected to the "
+        "emitting worker"
+    )
+
+socketio = SocketIO(
+    app,
+    cors_allowed_origins="*",
+    message_queue=os.environ.get('REDIS_URL')
+)
 
 # Database
 DB_PATH = 'helpdesk.db'
@@ -52,51 +95,221 @@ except Exception as e:
     vectorizer = None
     model_metadata = {}
 
+# Precompute the vectorizer internals once so the per-request hot path can
+# build the TF-IDF row directly instead of going through sklearn's
+# analyzer/regex pipeline on every ticket
+_TOKEN_PATTERN = re.compile(r"(?u)\b\w\w+\b")
+_vocabulary = None
+_idf_weights = None
+_vocab_size = 0
+
+def _fast_path_compatible(params):
+    """fast_tfidf_transform only reproduces one TfidfVectorizer config:
+    word unigrams+bigrams on the default token pattern, no stop words,
+    plain tf * idf with l2 norm. Any other setting (e.g. stop_words,
+    which sklearn applies BEFORE building bigrams) would make the fast
+    path produce different vectors, so check before enabling it.
+    """
+    return (params.get('analyzer') == 'word'
+            and params.get('ngram_range') == (1, 2)
+            and params.get('stop_words') is None
+            and params.get('tokenizer') is None
+            and params.get('preprocessor') is None
+            and params.get('strip_accents') is None
+            and params.get('token_pattern') == r"(?u)\b\w\w+\b"
+            and params.get('binary') is False
+            and params.get('use_idf') is True
+            and params.get('sublinear_tf') is False
+            and params.get('norm') == 'l2')
+
+if vectorizer is not None:
+    try:
+        if not _fast_path_compatible(vectorizer.get_params()):
+            print("⚠️  Fast vectorizer path disabled: vectorizer config "
+                  "not the plain unigram+bigram/l2 setup it reproduces; "
+                  "using vectorizer.transform")
+        else:
+            _vocabulary = dict(vectorizer.vocabulary_)
+            _idf_weights = np.ascontiguousarray(vectorizer.idf_, dtype=np.float64)
+            # Read-only: with gunicorn --preload these pages stay shared
+            # across forked workers instead of being copied on first write
+            _idf_weights.setflags(write=False)
+            _vocab_size = len(_vocabulary)
+            print(f"✓ Fast vectorizer path enabled ({_vocab_size} features)")
+    except Exception as e:
+        print(f"⚠️  Fast vectorizer path unavailable: {e}")
+        _vocabulary = None
+
+def fast_tfidf_transform(text):
+    """
+    Build the (1, vocab_size) TF-IDF row for one document directly.
+    Matches TfidfVectorizer with ngram_range=(1, 2) and l2 norm, but skips
+    the per-call sklearn analyzer pipeline (pure dict lookups + NumPy).
+    """
+    tokens = _TOKEN_PATTERN.findall(text)
+    lookup = _vocabulary.get
+    counts = {}
+
+    for token in tokens:
+        idx = lookup(token)
+        if idx is not None:
+            counts[idx] = counts.get(idx, 0) + 1
+
+    for i in range(len(tokens) - 1):
+        idx = lookup(tokens[i] + ' ' + tokens[i + 1])
+        if idx is not None:
+            counts[idx] = counts.get(idx, 0) + 1
+
+    if not counts:
+        return csr_matrix((1, _vocab_size))
+
+    indices = np.fromiter(counts.keys(), dtype=np.int32, count=len(counts))
+    data = np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+    data *= _idf_weights[indices]
+
+    norm = np.sqrt(np.dot(data, data))
+    if norm > 0:
+        data /= norm
+
+    return csr_matrix((data, indices, [0, len(data)]), shape=(1, _vocab_size))
+
 # =============================================================================
 # DATABASE FUNCTIONS
 # =============================================================================
 
+# Process-wide connection pool: requests check a connection out instead
+# of paying a fresh file open + WAL attach each time (POOL_SIZE /
+# POOL_TIMEOUT env vars tune it). Readers come from a read-only pool so
+# dashboards run in parallel under WAL; all writes funnel through one
+# lock-guarded writer connection and never thrash SQLite's file lock.
+#
+# Created lazily on first use, keyed to the current pid: under
+# gunicorn --preload this module is imported in the master before the
+# workers fork, and SQLite forbids carrying a connection across
+# fork() — inherited descriptors written from several workers can
+# corrupt the database. Each worker therefore opens its own pool.
+_db_pool = None
+_db_writer = None
+_db_owner_pid = None
+_db_init_lock = threading.Lock()
+
+def _ensure_db():
+    global _db_pool, _db_writer, _db_owner_pid
+    pid = os.getpid()
+    if _db_pool is not None and _db_owner_pid == pid:
+        return
+    with _db_init_lock:
+        if _db_pool is None or _db_owner_pid != pid:
+            _db_pool = SQLiteConnectionPool(DB_PATH, read_only=True)
+            _db_writer = SQLiteWriter(DB_PATH)
+            _db_owner_pid = pid
+
 def get_db_connection():
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+    """Context manager yielding a pooled read-only SQLite connection"""
+    _ensure_db()
+    return _db_pool.connection()
+
+def get_db_writer():
+    """Context manager yielding the single shared writer connection"""
+    _ensure_db()
+    return _db_writer.connection()
 
 def hash_password(password):
     return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
 
+# Short-lived cache of successful bcrypt verifications. bcrypt takes
+# ~100ms per check by design, which dominates repeated logins from the
+# same user. Keys are (stored hash, keyed blake2b of the password) so a
+# cache hit still requires knowing the exact password; entries expire
+# after 5 minutes and failures are never cached.
+_VERIFY_CACHE_TTL = 300
+_VERIFY_CACHE_MAX = 1024
+_verify_cache = {}
+_verify_pepper = hashlib.blake2b(
+    app.secret_key.encode('utf-8'), digest_size=32
+).digest()
+
+# bcrypt.checkpw holds the C hashing loop for ~100ms; run it off the
+# serving thread so the event loop stays responsive. Under the gunicorn
+# gevent worker, threading is monkey-patched and ThreadPoolExecutor
+# "threads" are greenlets on the one OS thread — only gevent's native
+# hub threadpool gives a real OS thread there — so the runner picks per
+# call (workers patch after fork, so import-time detection would miss).
+_bcrypt_executor = ThreadPoolExecutor(max_workers=8)
+
+def _run_bcrypt(fn, *args):
+    try:
+        from gevent import monkey, get_hub
+        if monkey.is_module_patched('threading'):
+            return get_hub().threadpool.apply(fn, args)
+    except ImportError:
+        pass
+    return _bcrypt_executor.submit(fn, *args).result()
+
+def _verify_cache_key(password, password_hash):
+    digest = hashlib.blake2b(
+        password.encode('utf-8'), key=_verify_pepper, digest_size=32
+    ).digest()
+    return (password_hash, digest)
+
 def verify_password(password, password_hash):
     try:
-        return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
+        cache_key = _verify_cache_key(password, password_hash)
+        now = time.time()
+
+        expires_at = _verify_cache.get(cache_key)
+        if expires_at is not None and now < expires_at:
+            return True
+
+        if not _run_bcrypt(
+            bcrypt.checkpw, password.encode('utf-8'), password_hash.encode('utf-8')
+        ):
+            return False
+
+        if len(_verify_cache) >= _VERIFY_CACHE_MAX:
+            _verify_cache.clear()
+        _verify_cache[cache_key] = now + _VERIFY_CACHE_TTL
+        return True
     except:
         return False
 
-def log_system_action(log_type, action, details=None, user_type=None, user_id=None, status='success'):
-    conn = get_db_connection()
-    try:
+def log_system_action(log_type, action, details=None, user_type=None, user_id=None, status='success', conn=None):
+    # Reuse the caller's connection when one is already checked out for
+    # this request; otherwise borrow one from the pool.
+    def _insert(conn):
         cursor = conn.cursor()
         cursor.execute("""
             INSERT INTO system_logs (log_type, user_type, user_id, action, details, status)
             VALUES (?, ?, ?, ?, ?, ?)
         """, (log_type, user_type, user_id, action, details, status))
         conn.commit()
+
+    try:
+        if conn is None:
+            with get_db_writer() as writer:
+                _insert(writer)
+        else:
+            _insert(conn)
     except:
         pass
-    finally:
-        conn.close()
 
-def create_notification(user_type, user_id, ticket_id, notification_type, title, message):
-    conn = get_db_connection()
-    try:
+def create_notification(user_type, user_id, ticket_id, notification_type, title, message, conn=None):
+    def _insert(conn):
         cursor = conn.cursor()
         cursor.execute("""
             INSERT INTO notifications (user_type, user_id, ticket_id, notification_type, title, message)
             VALUES (?, ?, ?, ?, ?, ?)
         """, (user_type, user_id, ticket_id, notification_type, title, message))
         conn.commit()
+
+    try:
+        if conn is None:
+            with get_db_writer() as writer:
+                _insert(writer)
+        else:
+            _insert(conn)
     except:
         pass
-    finally:
-        conn.close()
 
 # =============================================================================
 # ML FUNCTIONS - NOW PREDICTS CATEGORY + PRIORITY
@@ -114,8 +327,11 @@ def classify_ticket_with_ml(subject, description):
         # Combine text
         text = f"{subject} {description}".lower().strip()
         
-        # Vectorize
-        text_vec = vectorizer.transform([text])
+        # Vectorize (fast path skips sklearn's analyzer pipeline)
+        if _vocabulary is not None:
+            text_vec = fast_tfidf_transform(text)
+        else:
+            text_vec = vectorizer.transform([text])
         
         # PREDICT CATEGORY
         category = category_model.predict(text_vec)[0]
@@ -142,70 +358,183 @@ def classify_ticket_with_ml(subject, description):
 # AUTHENTICATION
 # =============================================================================
 
+@app.before_request
+def load_session_identity():
+    # Decode the signed session cookie once per request; handlers read
+    # g.user_id / g.role instead of hitting the session repeatedly
+    g.user_id = session.get('user_id')
+    g.role = session.get('role')
+
 def login_required(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        if 'user_id' not in session:
+        if g.user_id is None:
             return redirect(url_for('login'))
         return f(*args, **kwargs)
     return decorated_function
 
+def role_required(role):
+    """Require a logged-in session with the given role (403 otherwise)"""
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            if g.user_id is None:
+                return redirect(url_for('login'))
+            if g.role != role:
+                return jsonify({'error': 'Unauthorized'}), 403
+            return f(*args, **kwargs)
+        return decorated_function
+    return decorator
+
 # =============================================================================
 # TICKET ASSIGNMENT
 # =============================================================================
 
-def assign_ticket_to_technician(ticket_id, category, is_manual=False):
-    conn = get_db_connection()
+# Hot-path SQL lives in module constants: the same string object reaches
+# sqlite3 every call, so the per-connection statement cache always hits
+SQL_PICK_TECHNICIAN = """
+    SELECT t.id, t.name, t.skills, t.current_workload
+    FROM technicians t
+    JOIN technician_skills ts ON ts.technician_id = t.id
+    WHERE t.availability_status = 'Available'
+    AND ts.skill = ?
+    AND t.is_active = TRUE
+    ORDER BY t.current_workload ASC
+    LIMIT 1
+"""
+
+SQL_INSERT_ASSIGNMENT = """
+    INSERT INTO assignments (ticket_id, technician_id, assigned_by)
+    VALUES (?, ?, ?)
+"""
+
+SQL_MARK_TICKET_ASSIGNED = """
+    UPDATE tickets
+    SET status = 'Assigned', assigned_at = CURRENT_TIMESTAMP
+    WHERE id = ?
+    RETURNING ticket_number, subject, category, priority
+"""
+
+SQL_INSERT_TICKET = """
+    INSERT INTO tickets (
+        ticket_number, subject, description, category, category_id, priority,
+        user_id, confidence_score, flagged_for_manual_review, status,
+        classified_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+"""
+
+# Category name -> id, filled lazily; the model's label set is tiny and
+# fixed per model version so the cache stays hot for the process lifetime
+_category_id_cache = {}
+
+def get_category_id(conn, name):
+    if name is None:
+        return None
+    category_id = _category_id_cache.get(name)
+    if category_id is not None:
+        return category_id
     cursor = conn.cursor()
-    
-    cursor.execute("""
-        SELECT id, name, skills, current_workload 
-        FROM technicians 
-        WHERE availability_status = 'Available' 
-        AND skills LIKE ?
-        AND is_active = TRUE
-        ORDER BY current_workload ASC
-        LIMIT 1
-    """, (f'%{category}%',))
-    
-    technician = cursor.fetchone()
-    
-    if technician:
+    cursor.execute("SELECT id FROM categories WHERE name = ?", (name,))
+    row = cursor.fetchone()
+    if row is None:
+        cursor.execute("INSERT INTO categories (name) VALUES (?)", (name,))
+        category_id = cursor.lastrowid
+    else:
+        category_id = row['id']
+    _category_id_cache[name] = category_id
+    return category_id
+
+# Single background worker: auto-assignment (a SELECT plus three writes)
+# runs off the submit_ticket critical path, and one worker keeps the
+# SQLite writes serialized
+_assignment_executor = ThreadPoolExecutor(max_workers=1)
+
+@socketio.on('connect')
+def on_socket_connect():
+    # Clients join a room per identity so assignment events go only to
+    # the technician (and admins) concerned instead of every connection
+    if session.get('role') == 'technician':
+        join_room(f"tech_{session['user_id']}")
+    elif session.get('role') == 'admin':
+        join_room('admins')
+
+def _assign_in_background(ticket_id, category):
+    try:
+        technician = assign_ticket_to_technician(ticket_id, category, is_manual=False)
+        if technician:
+            socketio.emit('ticket_auto_assigned', {
+                'ticket_id': ticket_id,
+                'technician_id': technician['id'],
+                'technician_name': technician['name']
+            }, to='admins')
+    except Exception as e:
+        print(f"Background assignment error: {e}")
+
+# With several gunicorn workers each process has its own writer
+# connection, so the pick-technician/insert-assignment sequence can
+# still hit SQLITE_BUSY; retry briefly with backoff instead of failing
+_ASSIGN_MAX_RETRIES = 3
+_ASSIGN_BACKOFF = 0.05  # seconds, doubled per attempt
+
+def assign_ticket_to_technician(ticket_id, category, is_manual=False):
+    for attempt in range(_ASSIGN_MAX_RETRIES):
+        try:
+            return _assign_ticket_locked(ticket_id, category, is_manual)
+        except sqlite3.OperationalError as e:
+            if 'locked' not in str(e) and 'busy' not in str(e):
+                raise
+            if attempt == _ASSIGN_MAX_RETRIES - 1:
+                raise
+            time.sleep(_ASSIGN_BACKOFF * (2 ** attempt))
+
+def _post_assign_side_effects(ticket_id, technician_id, notification_title,
+                              notification_message, payload):
+    # Runs on a background task after the assignment commit: the
+    # notification INSERT and Socket.IO emit add latency but not
+    # correctness, so the caller returns as soon as the commit lands
+    try:
+        create_notification('technician', technician_id, ticket_id,
+                            'ticket_assigned', notification_title,
+                            notification_message)
+        socketio.emit('new_ticket_assigned', payload, to=f"tech_{technician_id}")
+    except Exception as e:
+        print(f"Post-assignment side effect error: {e}")
+
+def _assign_ticket_locked(ticket_id, category, is_manual):
+    with get_db_writer() as conn:
+        cursor = conn.cursor()
+
+        # BEGIN IMMEDIATE takes the write lock before the technician is
+        # picked, so workload cannot change between the SELECT and the
+        # INSERT in another process
+        cursor.execute("BEGIN IMMEDIATE")
+
+        # Equality join on the normalized skills table; the old
+        # skills LIKE '%category%' forced a scan of every technician
+        cursor.execute(SQL_PICK_TECHNICIAN, (category,))
+
+        technician = cursor.fetchone()
+
+        if not technician:
+            return None
         assigned_by = 'Admin' if is_manual else 'AI System'
-        cursor.execute("""
-            INSERT INTO assignments (ticket_id, technician_id, assigned_by) 
-            VALUES (?, ?, ?)
-        """, (ticket_id, technician['id'], assigned_by))
-        
-        cursor.execute("""
-            UPDATE tickets 
-            SET status = 'Assigned', assigned_at = CURRENT_TIMESTAMP
-            WHERE id = ?
-        """, (ticket_id,))
-        
-        cursor.execute("""
-            UPDATE technicians 
-            SET current_workload = current_workload + 1 
-            WHERE id = ?
-        """, (technician['id'],))
-        
-        cursor.execute("""
-            SELECT ticket_number, subject, category, priority
-            FROM tickets WHERE id = ?
-        """, (ticket_id,))
+        cursor.execute(SQL_INSERT_ASSIGNMENT, (ticket_id, technician['id'], assigned_by))
+
+        # RETURNING folds the trailing SELECT into the status update
+        cursor.execute(SQL_MARK_TICKET_ASSIGNED, (ticket_id,))
         ticket_info = cursor.fetchone()
-        
+
+        # current_workload is maintained by trg_assignment_insert
+
         conn.commit()
-        
+        invalidate_admin_stats()
+
         if ticket_info:
-            create_notification(
-                'technician', technician['id'], ticket_id,
-                'ticket_assigned', 'New Ticket Assigned',
-                f"Ticket {ticket_info['ticket_number']}: {ticket_info['subject']}"
-            )
-            
-            try:
-                socketio.emit('new_ticket_assigned', {
+            socketio.start_background_task(
+                _post_assign_side_effects, ticket_id, technician['id'],
+                'New Ticket Assigned',
+                f"Ticket {ticket_info['ticket_number']}: {ticket_info['subject']}",
+                {
                     'technician_id': technician['id'],
                     'ticket_id': ticket_id,
                     'ticket_number': ticket_info['ticket_number'],
@@ -214,16 +543,10 @@ def assign_ticket_to_technician(ticket_id, category, is_manual=False):
                     'priority': ticket_info['priority'],
                     'assigned_by': assigned_by,
                     'message': f"New {ticket_info['priority']} priority ticket assigned"
-                }, broadcast=True)
-            except:
-                pass
-        
-        result = dict(technician)
-        conn.close()
-        return result
-    
-    conn.close()
-    return None
+                }
+            )
+
+        return dict(technician)
 
 # =============================================================================
 # ROUTES
@@ -233,6 +556,11 @@ def assign_ticket_to_technician(ticket_id, category, is_manual=False):
 def index():
     return render_template('index.html')
 
+# Role -> account table / post-login endpoint lookup; queries are built
+# from this dict so no identifier is ever interpolated from request data
+TABLE_BY_ROLE = {'user': 'users', 'technician': 'technicians', 'admin': 'admins'}
+DASHBOARD_BY_ROLE = {'user': 'user_dashboard', 'technician': 'technician_dashboard', 'admin': 'admin_dashboard'}
+
 @app.route('/login', methods=['GET', 'POST'])
 def login():
     if request.method == 'POST':
@@ -240,212 +568,220 @@ def login():
         password = request.form.get('password')
         role = request.form.get('role', 'user')
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        if role == 'user':
-            cursor.execute("SELECT * FROM users WHERE email = ? AND is_active = TRUE", (email,))
-        elif role == 'technician':
-            cursor.execute("SELECT * FROM technicians WHERE email = ? AND is_active = TRUE", (email,))
-        elif role == 'admin':
-            cursor.execute("SELECT * FROM admins WHERE email = ? AND is_active = TRUE", (email,))
-        else:
-            conn.close()
+        table_name = TABLE_BY_ROLE.get(role)
+        if table_name is None:
             return jsonify({'error': 'Invalid role'}), 400
-        
-        user = cursor.fetchone()
-        
+
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT * FROM {table_name} WHERE email = ? AND is_active = TRUE", (email,))
+            user = cursor.fetchone()
+
         if user and verify_password(password, user['password_hash']):
-            table_name = 'users' if role == 'user' else ('technicians' if role == 'technician' else 'admins')
-            cursor.execute(f"UPDATE {table_name} SET last_login = CURRENT_TIMESTAMP WHERE id = ?", (user['id'],))
-            conn.commit()
-            
+            with get_db_writer() as writer:
+                writer.execute(f"UPDATE {table_name} SET last_login = CURRENT_TIMESTAMP WHERE id = ?", (user['id'],))
+                writer.commit()
+
+                log_system_action('login', f"{role.title()} login successful", f"User: {user['email']}", role, user['id'], 'success', conn=writer)
+
             session['user_id'] = user['id']
             session['name'] = user['name']
             session['email'] = user['email']
             session['role'] = role
-            
-            log_system_action('login', f"{role.title()} login successful", f"User: {user['email']}", role, user['id'], 'success')
-            
-            conn.close()
-            
-            if role == 'user':
-                return redirect(url_for('user_dashboard'))
-            elif role == 'technician':
-                return redirect(url_for('technician_dashboard'))
-            else:
-                return redirect(url_for('admin_dashboard'))
+
+            return redirect(url_for(DASHBOARD_BY_ROLE[role]))
         else:
             log_system_action('login', 'Login failed', f"Email: {email}, Role: {role}", status='failure')
-            conn.close()
             return render_template('login.html', error='Invalid credentials')
     
     return render_template('login.html')
 
 @app.route('/logout')
 def logout():
-    log_system_action('logout', 'User logged out', user_type=session.get('role'), user_id=session.get('user_id'))
+    log_system_action('logout', 'User logged out', user_type=g.role, user_id=g.user_id)
     session.clear()
     return redirect(url_for('index'))
 
-@app.route('/user/dashboard')
-@login_required
-def user_dashboard():
-    if session.get('role') != 'user':
-        return redirect(url_for('index'))
-    
-    conn = get_db_connection()
+# The dashboards all want the same ticket + active assignment +
+# user/technician join and differ only in filter and ordering; a single
+# SELECT shape means SQLite caches one plan per WHERE variant and any
+# index tuning covers every dashboard at once
+_TICKETS_SELECT = """
+    SELECT t.*, a.technician_id, a.assigned_at, a.assigned_by,
+           tech.name as technician_name,
+           u.name as user_name, u.email as user_email
+    FROM tickets t
+    LEFT JOIN assignments a ON a.ticket_id = t.id AND a.is_active = TRUE
+    LEFT JOIN technicians tech ON tech.id = a.technician_id
+    JOIN users u ON u.id = t.user_id
+"""
+
+_PRIORITY_ORDER = """
+    CASE t.priority
+        WHEN 'Critical' THEN 1
+        WHEN 'High' THEN 2
+        WHEN 'Medium' THEN 3
+        WHEN 'Low' THEN 4
+    END, t.submitted_at ASC
+"""
+
+def _fetch_tickets(conn, where_clause, params, order_by):
+    """Run the shared dashboard query with the caller's filter and
+    ordering; returns formatted dict rows"""
     cursor = conn.cursor()
-    
-    cursor.execute("""
-        SELECT t.*, a.technician_id, tech.name as technician_name
-        FROM tickets t
-        LEFT JOIN assignments a ON t.id = a.ticket_id AND a.is_active = TRUE
-        LEFT JOIN technicians tech ON a.technician_id = tech.id
-        WHERE t.user_id = ?
-        ORDER BY t.submitted_at DESC
-    """, (session['user_id'],))
-    
-    tickets = cursor.fetchall()
-    
+    cursor.execute(f"{_TICKETS_SELECT} WHERE {where_clause} ORDER BY {order_by}", params)
+
     formatted_tickets = []
-    for ticket in tickets:
+    for ticket in cursor.fetchall():
         ticket_dict = dict(ticket)
         if ticket_dict['submitted_at']:
-            ticket_dict['submitted_at_formatted'] = datetime.fromisoformat(ticket_dict['submitted_at']).strftime('%Y-%m-%d %H:%M')
+            # CURRENT_TIMESTAMP is already 'YYYY-MM-DD HH:MM:SS'; slicing
+            # beats a fromisoformat/strftime round trip per row
+            ticket_dict['submitted_at_formatted'] = ticket_dict['submitted_at'][:16]
         formatted_tickets.append(ticket_dict)
-    
-    conn.close()
+    return formatted_tickets
+
+@app.route('/user/dashboard')
+@login_required
+def user_dashboard():
+    if g.role != 'user':
+        return redirect(url_for('index'))
+
+    with get_db_connection() as conn:
+        formatted_tickets = _fetch_tickets(
+            conn, "t.user_id = ?", (g.user_id,), "t.submitted_at DESC")
+
     return render_template('user_dashboard.html', tickets=formatted_tickets)
 
 @app.route('/technician/dashboard')
 @login_required
 def technician_dashboard():
-    if session.get('role') != 'technician':
+    if g.role != 'technician':
         return redirect(url_for('index'))
-    
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
+
+    with get_db_connection() as conn:
+        formatted_tickets = _fetch_tickets(
+            conn, "a.technician_id = ? AND a.is_active = TRUE",
+            (g.user_id,), _PRIORITY_ORDER)
+
+    # Stats come from the rows we already fetched (same filter as the
+    # query above), saving a second JOIN over assignments
+    stats = {'total_assigned': len(formatted_tickets), 'pending': 0, 'in_progress': 0}
+    for ticket_dict in formatted_tickets:
+        if ticket_dict['status'] == 'Assigned':
+            stats['pending'] += 1
+        elif ticket_dict['status'] == 'In Progress':
+            stats['in_progress'] += 1
+
+    return render_template('technician_dashboard.html', tickets=formatted_tickets, stats=stats)
+
+# Ticket-wide aggregates (status counts, category distribution) are the
+# most expensive part of the admin dashboard and change only on writes;
+# cache them briefly and let the write paths drop the cache
+_ADMIN_STATS_TTL = 10  # seconds
+_admin_stats_cache = {'data': None, 'expires': 0.0}
+
+def invalidate_admin_stats():
+    _admin_stats_cache['data'] = None
+    _admin_stats_cache['expires'] = 0.0
+
+def get_admin_stats(cursor):
+    now = time.time()
+    cached = _admin_stats_cache['data']
+    if cached is not None and now < _admin_stats_cache['expires']:
+        return cached
+
     cursor.execute("""
-        SELECT t.*, a.assigned_at, a.assigned_by, u.name as user_name, u.email as user_email
-        FROM assignments a
-        JOIN tickets t ON a.ticket_id = t.id
-        JOIN users u ON t.user_id = u.id
-        WHERE a.technician_id = ? AND a.is_active = TRUE
-        ORDER BY 
-            CASE t.priority
-                WHEN 'Critical' THEN 1
-                WHEN 'High' THEN 2
-                WHEN 'Medium' THEN 3
-                WHEN 'Low' THEN 4
-            END, t.submitted_at ASC
-    """, (session['user_id'],))
-    
-    tickets = cursor.fetchall()
-    
+    SELECT
+        COUNT(*) as total_tickets,
+        SUM(CASE WHEN status = 'Assigned' THEN 1 ELSE 0 END) as assigned,
+        SUM(CASE WHEN status = 'Resolved' THEN 1 ELSE 0 END) as resolved,
+        SUM(CASE WHEN flagged_for_manual_review = TRUE THEN 1 ELSE 0 END) as flagged_count,
+        AVG(CASE WHEN confidence_score IS NOT NULL THEN confidence_score ELSE 0 END) as avg_confidence
+    FROM tickets
+    """)
+    stats = dict(cursor.fetchone())
+
+    # Grouping on the indexed integer FK; the join only resolves the
+    # handful of category names afterwards
     cursor.execute("""
-        SELECT 
-            COUNT(*) as total_assigned,
-            SUM(CASE WHEN t.status = 'Assigned' THEN 1 ELSE 0 END) as pending,
-            SUM(CASE WHEN t.status = 'In Progress' THEN 1 ELSE 0 END) as in_progress
-        FROM assignments a
-        JOIN tickets t ON a.ticket_id = t.id
-        WHERE a.technician_id = ? AND a.is_active = TRUE
-    """, (session['user_id'],))
-    
-    stats = cursor.fetchone()
-    
-    formatted_tickets = []
-    for ticket in tickets:
-        ticket_dict = dict(ticket)
-        if ticket_dict['submitted_at']:
-            ticket_dict['submitted_at_formatted'] = datetime.fromisoformat(ticket_dict['submitted_at']).strftime('%Y-%m-%d %H:%M')
-        formatted_tickets.append(ticket_dict)
-    
-    conn.close()
-    return render_template('technician_dashboard.html', tickets=formatted_tickets, stats=dict(stats) if stats else {})
+    SELECT c.name as category, COUNT(*) as count
+    FROM tickets t
+    JOIN categories c ON t.category_id = c.id
+    GROUP BY c.id ORDER BY count DESC
+    """)
+    category_dist = [dict(row) for row in cursor.fetchall()]
+
+    data = (stats, category_dist)
+    _admin_stats_cache['data'] = data
+    _admin_stats_cache['expires'] = now + _ADMIN_STATS_TTL
+    return data
 
 @app.route('/admin/dashboard')
 @login_required
 def admin_dashboard():
-    if session.get('role') != 'admin':
+    if g.role != 'admin':
         return redirect(url_for('index'))
-    
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute("""
-        SELECT 
-            COUNT(*) as total_tickets,
-            SUM(CASE WHEN status = 'Assigned' THEN 1 ELSE 0 END) as assigned,
-            SUM(CASE WHEN status = 'Resolved' THEN 1 ELSE 0 END) as resolved,
-            SUM(CASE WHEN flagged_for_manual_review = TRUE THEN 1 ELSE 0 END) as flagged_count,
-            AVG(CASE WHEN confidence_score IS NOT NULL THEN confidence_score ELSE 0 END) as avg_confidence
-        FROM tickets
-    """)
-    stats = cursor.fetchone()
-    
-    cursor.execute("""
-        SELECT category, COUNT(*) as count
-        FROM tickets WHERE category IS NOT NULL
-        GROUP BY category ORDER BY count DESC
-    """)
-    category_dist = cursor.fetchall()
-    
-    cursor.execute("""
-        SELECT t.*, u.name as user_name, u.email as user_email
+
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+
+        stats, category_dist = get_admin_stats(cursor)
+
+        # One scan serves both lists: flagged-open tickets plus the 10
+        # most recent, split in Python below
+        cursor.execute("""
+        SELECT t.*, u.name as user_name, u.email as user_email,
+               tech.name as technician_name,
+               (t.flagged_for_manual_review = TRUE AND t.status != 'Closed') as is_flagged,
+               t.id IN (SELECT id FROM tickets ORDER BY submitted_at DESC LIMIT 10) as is_recent
         FROM tickets t
         JOIN users u ON t.user_id = u.id
-        WHERE t.flagged_for_manual_review = TRUE AND t.status != 'Closed'
+        LEFT JOIN assignments a ON a.ticket_id = t.id AND a.is_active = TRUE
+        LEFT JOIN technicians tech ON tech.id = a.technician_id
+        WHERE (t.flagged_for_manual_review = TRUE AND t.status != 'Closed')
+           OR t.id IN (SELECT id FROM tickets ORDER BY submitted_at DESC LIMIT 10)
         ORDER BY t.submitted_at DESC
-    """)
-    flagged_tickets = cursor.fetchall()
-    
-    cursor.execute("""
+        """)
+        ticket_rows = cursor.fetchall()
+
+        cursor.execute("""
         SELECT id, name, skills, current_workload, max_workload
         FROM technicians WHERE is_active = TRUE
         ORDER BY current_workload ASC
-    """)
-    technicians = cursor.fetchall()
-    
-    cursor.execute("""
-        SELECT t.*, u.name as user_name
-        FROM tickets t
-        JOIN users u ON t.user_id = u.id
-        ORDER BY t.submitted_at DESC LIMIT 10
-    """)
-    recent_tickets = cursor.fetchall()
-    
-    cursor.execute("""
+        """)
+        technicians = cursor.fetchall()
+
+        cursor.execute("""
         SELECT model_version, accuracy, training_date, is_active
         FROM model_logs WHERE is_active = TRUE
         ORDER BY training_date DESC LIMIT 1
-    """)
-    model_info = cursor.fetchone()
-    
+        """)
+        model_info = cursor.fetchone()
+
     formatted_flagged = []
-    for ticket in flagged_tickets:
-        ticket_dict = dict(ticket)
-        if ticket_dict['submitted_at']:
-            ticket_dict['submitted_at_formatted'] = datetime.fromisoformat(ticket_dict['submitted_at']).strftime('%Y-%m-%d %H:%M')
-        formatted_flagged.append(ticket_dict)
-    
     formatted_recent = []
-    for ticket in recent_tickets:
+    for ticket in ticket_rows:
         ticket_dict = dict(ticket)
         if ticket_dict['submitted_at']:
-            ticket_dict['submitted_at_formatted'] = datetime.fromisoformat(ticket_dict['submitted_at']).strftime('%Y-%m-%d %H:%M')
-        formatted_recent.append(ticket_dict)
-    
-    conn.close()
-    
+            # CURRENT_TIMESTAMP is already 'YYYY-MM-DD HH:MM:SS'; slicing
+            # beats a fromisoformat/strftime round trip per row
+            ticket_dict['submitted_at_formatted'] = ticket_dict['submitted_at'][:16]
+        if ticket_dict.pop('is_flagged'):
+            formatted_flagged.append(ticket_dict)
+        if ticket_dict.pop('is_recent'):
+            formatted_recent.append(ticket_dict)
+
+    # One dict() per row, built once; the ticket query already joins
+    # the assigned technician's name so the template needs no lookup
+    technicians = [dict(t) for t in technicians]
+
     return render_template('admin_dashboard_pro.html',
-                         stats=dict(stats) if stats else {},
-                         category_dist=[dict(c) for c in category_dist],
+                         stats=stats,
+                         category_dist=category_dist,
                          flagged_tickets=formatted_flagged,
-                         technicians=[dict(t) for t in technicians],
-                         recent_tickets=formatted_recent,
+                         technicians=technicians,
+                         all_tickets=formatted_recent,
                          model_info=dict(model_info) if model_info else None,
                          confidence_threshold=CONFIDENCE_THRESHOLD * 100)
 
@@ -454,11 +790,8 @@ def admin_dashboard():
 # =============================================================================
 
 @app.route('/api/tickets/submit', methods=['POST'])
-@login_required
+@role_required('user')
 def submit_ticket():
-    if session.get('role') != 'user':
-        return jsonify({'error': 'Unauthorized'}), 403
-    
     data = request.get_json()
     subject = data.get('subject') if data else None
     description = data.get('description') if data else None
@@ -469,31 +802,27 @@ def submit_ticket():
     # ML PREDICTS BOTH CATEGORY AND PRIORITY
     category, cat_confidence, priority, pri_confidence, needs_manual_review = classify_ticket_with_ml(subject, description)
     
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
     ticket_number = f"TKT-{datetime.now().strftime('%Y%m%d%H%M%S')}"
-    
+
     try:
-        cursor.execute("""
-            INSERT INTO tickets (
-                ticket_number, subject, description, category, priority,
-                user_id, confidence_score, flagged_for_manual_review, status
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (ticket_number, subject, description, category, priority,
-              session['user_id'], cat_confidence, needs_manual_review, 'Classified'))
-        
-        ticket_id = cursor.lastrowid
-        
-        cursor.execute("UPDATE tickets SET classified_at = CURRENT_TIMESTAMP WHERE id = ?", (ticket_id,))
-        conn.commit()
-        
-        assigned_technician = None
+        with get_db_writer() as conn:
+            cursor = conn.cursor()
+            category_id = get_category_id(conn, category)
+            cursor.execute(SQL_INSERT_TICKET,
+                           (ticket_number, subject, description, category, category_id,
+                            priority, g.user_id, cat_confidence, needs_manual_review,
+                            'Classified'))
+
+            ticket_id = cursor.lastrowid
+            conn.commit()
+        invalidate_admin_stats()
+
+        # Auto-assignment happens in the background; the user only needs
+        # the ticket number confirmed. The UI gets a ticket_auto_assigned
+        # Socket.IO event once a technician is picked.
         if not needs_manual_review and category:
-            assigned_technician = assign_ticket_to_technician(ticket_id, category, is_manual=False)
-        
-        conn.close()
-        
+            _assignment_executor.submit(_assign_in_background, ticket_id, category)
+
         response_data = {
             'success': True,
             'ticket_number': ticket_number,
@@ -501,27 +830,18 @@ def submit_ticket():
             'category_confidence': cat_confidence,
             'priority': priority,
             'priority_confidence': pri_confidence,
-            'needs_manual_review': needs_manual_review
+            'needs_manual_review': needs_manual_review,
+            'assigned_to': 'Pending',
+            'status': 'Awaiting Assignment' if needs_manual_review else 'Classified'
         }
-        
-        if assigned_technician:
-            response_data['assigned_to'] = assigned_technician['name']
-            response_data['status'] = 'Assigned'
-        else:
-            response_data['status'] = 'Awaiting Assignment' if needs_manual_review else 'Classified'
-        
+
         return jsonify(response_data), 201
     except Exception as e:
-        conn.rollback()
-        conn.close()
         return jsonify({'error': 'Database error'}), 500
 
 @app.route('/api/tickets/<int:ticket_id>/update-status', methods=['PUT'])
-@login_required
+@role_required('technician')
 def update_ticket_status(ticket_id):
-    if session.get('role') != 'technician':
-        return jsonify({'error': 'Unauthorized'}), 403
-    
     data = request.get_json()
     new_status = data.get('status')
     notes = data.get('notes', '')
@@ -529,68 +849,70 @@ def update_ticket_status(ticket_id):
     if new_status not in ['Assigned', 'In Progress', 'Resolved']:
         return jsonify({'error': 'Invalid status'}), 400
     
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
     try:
-        cursor.execute("""
-            SELECT a.id FROM assignments a
-            WHERE a.ticket_id = ? AND a.technician_id = ? AND a.is_active = TRUE
-        """, (ticket_id, session['user_id']))
-        
-        if not cursor.fetchone():
-            conn.close()
-            return jsonify({'error': 'Unauthorized'}), 403
-        
-        cursor.execute("UPDATE tickets SET status = ? WHERE id = ?", (new_status, ticket_id))
-        
-        if new_status == 'In Progress':
-            cursor.execute("UPDATE tickets SET in_progress_at = CURRENT_TIMESTAMP WHERE id = ? AND in_progress_at IS NULL", (ticket_id,))
-        elif new_status == 'Resolved':
-            cursor.execute("UPDATE tickets SET resolved_at = CURRENT_TIMESTAMP WHERE id = ? AND resolved_at IS NULL", (ticket_id,))
-            cursor.execute("UPDATE assignments SET completed_at = CURRENT_TIMESTAMP WHERE ticket_id = ? AND technician_id = ?", (ticket_id, session['user_id']))
-            cursor.execute("UPDATE technicians SET total_tickets_resolved = total_tickets_resolved + 1, current_workload = current_workload - 1 WHERE id = ?", (session['user_id'],))
-        
-        conn.commit()
-        conn.close()
+        with get_db_writer() as conn:
+            cursor = conn.cursor()
+            # Status and lifecycle timestamp land in one UPDATE; the CASE
+            # arms stamp in_progress_at/resolved_at only on first entry,
+            # and the EXISTS clause folds the technician authorization
+            # check into the same statement (rowcount 0 = not theirs)
+            cursor.execute("""
+                UPDATE tickets SET
+                    status = ?,
+                    in_progress_at = CASE WHEN ? = 'In Progress' AND in_progress_at IS NULL
+                                          THEN CURRENT_TIMESTAMP ELSE in_progress_at END,
+                    resolved_at = CASE WHEN ? = 'Resolved' AND resolved_at IS NULL
+                                       THEN CURRENT_TIMESTAMP ELSE resolved_at END
+                WHERE id = ? AND EXISTS (
+                    SELECT 1 FROM assignments a
+                    WHERE a.ticket_id = tickets.id
+                      AND a.technician_id = ?
+                      AND a.is_active = TRUE
+                )
+            """, (new_status, new_status, new_status, ticket_id, g.user_id))
+
+            if cursor.rowcount == 0:
+                return jsonify({'error': 'Unauthorized'}), 403
+
+            if new_status == 'Resolved':
+                # trg_assignment_complete updates workload + resolved count
+                cursor.execute("UPDATE assignments SET completed_at = CURRENT_TIMESTAMP WHERE ticket_id = ? AND technician_id = ?", (ticket_id, g.user_id))
+
+            conn.commit()
+        invalidate_admin_stats()
         return jsonify({'success': True, 'status': new_status})
     except:
-        conn.rollback()
-        conn.close()
         return jsonify({'error': 'Error'}), 500
 
 @app.route('/api/admin/assign-ticket', methods=['POST'])
-@login_required
+@role_required('admin')
 def manual_assign_ticket():
-    if session.get('role') != 'admin':
-        return jsonify({'error': 'Unauthorized'}), 403
-    
     data = request.get_json()
     ticket_id = data.get('ticket_id')
     technician_id = data.get('technician_id')
     reason = data.get('reason', 'Manual assignment by admin')
     
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
     try:
-        cursor.execute("SELECT * FROM tickets WHERE id = ?", (ticket_id,))
-        ticket = cursor.fetchone()
-        
-        if not ticket:
-            conn.close()
-            return jsonify({'error': 'Ticket not found'}), 404
-        
-        cursor.execute("INSERT INTO assignments (ticket_id, technician_id, assigned_by) VALUES (?, ?, 'Admin')", (ticket_id, technician_id))
-        cursor.execute("UPDATE tickets SET status = 'Assigned', assigned_at = CURRENT_TIMESTAMP, flagged_for_manual_review = FALSE, manual_assignment_reason = ? WHERE id = ?", (reason, ticket_id))
-        cursor.execute("UPDATE technicians SET current_workload = current_workload + 1 WHERE id = ?", (technician_id,))
-        
-        conn.commit()
-        
-        create_notification('technician', technician_id, ticket_id, 'ticket_assigned', 'New Ticket Manually Assigned', f"Admin assigned ticket {ticket['ticket_number']} to you")
-        
-        try:
-            socketio.emit('new_ticket_assigned', {
+        with get_db_writer() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM tickets WHERE id = ?", (ticket_id,))
+            ticket = cursor.fetchone()
+
+            if not ticket:
+                return jsonify({'error': 'Ticket not found'}), 404
+
+            # workload bump handled by trg_assignment_insert
+            cursor.execute("INSERT INTO assignments (ticket_id, technician_id, assigned_by) VALUES (?, ?, 'Admin')", (ticket_id, technician_id))
+            cursor.execute("UPDATE tickets SET status = 'Assigned', assigned_at = CURRENT_TIMESTAMP, flagged_for_manual_review = FALSE, manual_assignment_reason = ? WHERE id = ?", (reason, ticket_id))
+
+            conn.commit()
+            invalidate_admin_stats()
+
+        socketio.start_background_task(
+            _post_assign_side_effects, ticket_id, technician_id,
+            'New Ticket Manually Assigned',
+            f"Admin assigned ticket {ticket['ticket_number']} to you",
+            {
                 'technician_id': technician_id,
                 'ticket_id': ticket_id,
                 'ticket_number': ticket['ticket_number'],
@@ -599,41 +921,33 @@ def manual_assign_ticket():
                 'priority': ticket['priority'],
                 'assigned_by': 'Admin',
                 'message': f"Manual assignment: {ticket['ticket_number']}"
-            }, broadcast=True)
-        except:
-            pass
-        
-        conn.close()
+            }
+        )
+
         return jsonify({'success': True})
     except:
-        conn.rollback()
-        conn.close()
         return jsonify({'error': 'Error'}), 500
 
 @app.route('/api/admin/close-ticket/<int:ticket_id>', methods=['POST'])
-@login_required
+@role_required('admin')
 def close_ticket(ticket_id):
-    if session.get('role') != 'admin':
-        return jsonify({'error': 'Unauthorized'}), 403
-    
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
     try:
-        cursor.execute("SELECT status FROM tickets WHERE id = ?", (ticket_id,))
-        ticket = cursor.fetchone()
-        
-        if not ticket or ticket['status'] != 'Resolved':
-            conn.close()
-            return jsonify({'error': 'Only resolved tickets can be closed'}), 400
-        
-        cursor.execute("UPDATE tickets SET status = 'Closed', closed_at = CURRENT_TIMESTAMP WHERE id = ?", (ticket_id,))
-        conn.commit()
-        conn.close()
+        with get_db_writer() as conn:
+            cursor = conn.cursor()
+            # Precondition lives in the WHERE clause: the UPDATE only
+            # fires on a Resolved ticket, so no check-then-act SELECT
+            cursor.execute("""
+                UPDATE tickets SET status = 'Closed', closed_at = CURRENT_TIMESTAMP
+                WHERE id = ? AND status = 'Resolved'
+            """, (ticket_id,))
+
+            if cursor.rowcount == 0:
+                return jsonify({'error': 'Only resolved tickets can be closed'}), 400
+
+            conn.commit()
+        invalidate_admin_stats()
         return jsonify({'success': True})
     except:
-        conn.rollback()
-        conn.close()
         return jsonify({'error': 'Error'}), 500
 
 # =============================================================================
@@ -0,0 +1,95 @@
+"""
+Process-wide SQLite connection pool for the helpdesk app.
+
+Opening a SQLite connection per request costs several file opens plus
+the WAL attach; the pool opens POOL_SIZE connections once and hands
+them out via a context manager. Connections are opened with
+check_same_thread=False so the pool can serve Flask request threads and
+background workers alike.
+
+SQLite serializes writes at the file level, so the app pairs a
+read-only pool (dashboards, lookups) with one long-lived writer
+connection (SQLiteWriter) guarded by a lock: with WAL mode readers run
+in parallel and never block behind the writer.
+"""
+
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+POOL_SIZE = int(os.environ.get('POOL_SIZE', 5))
+POOL_TIMEOUT = float(os.environ.get('POOL_TIMEOUT', 30))
+
+
+def _open_connection(db_path, read_only=False):
+    # cached_statements: hot queries are module-level constants in the
+    # app, so a larger per-connection statement cache always hits
+    conn = sqlite3.connect(db_path, check_same_thread=False,
+                           cached_statements=256)
+    conn.row_factory = sqlite3.Row
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.execute('PRAGMA busy_timeout=5000')
+    conn.execute('PRAGMA foreign_keys=ON')
+    conn.execute('PRAGMA temp_store=MEMORY')
+    conn.execute('PRAGMA cache_size=-65536')     # 64 MB page cache
+    conn.execute('PRAGMA mmap_size=268435456')   # 256 MB memory-mapped I/O
+    if read_only:
+        # query_only (instead of a mode=ro URI) so the pool can be
+        # created before the reset script has built the database file
+        conn.execute('PRAGMA query_only=1')
+    return conn
+
+
+class SQLiteConnectionPool:
+    def __init__(self, db_path, pool_size=POOL_SIZE, read_only=False):
+        self.db_path = db_path
+        self.read_only = read_only
+        self._pool = queue.LifoQueue(maxsize=pool_size)
+        for _ in range(pool_size):
+            self._pool.put(self._open_connection())
+
+    def _open_connection(self):
+        return _open_connection(self.db_path, read_only=self.read_only)
+
+    @contextmanager
+    def connection(self, timeout=POOL_TIMEOUT):
+        conn = self._pool.get(timeout=timeout)
+        try:
+            # Pre-ping: replace the connection if it has gone bad
+            try:
+                conn.execute('SELECT 1')
+            except sqlite3.Error:
+                try:
+                    conn.close()
+                except sqlite3.Error:
+                    pass
+                conn = self._open_connection()
+            yield conn
+        finally:
+            # Never return a connection mid-transaction to the pool
+            if conn.in_transaction:
+                conn.rollback()
+            self._pool.put(conn)
+
+
+class SQLiteWriter:
+    """Single long-lived RW connection; a lock serializes writers in
+    process instead of thrashing on SQLite's file lock."""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = _open_connection(db_path)
+
+    @contextmanager
+    def connection(self):
+        with self._lock:
+            conn = self._conn
+            try:
+                yield conn
+            finally:
+                if conn.in_transaction:
+                    conn.rollback()
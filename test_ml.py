@@ -3,7 +3,10 @@ Quick Test - Shows ML Model Working
 Run this to see the classification in action
 """
 
+import os
+
 import joblib
+import numpy as np
 
 print("\n" + "="*60)
 print("HELPDESK ML SYSTEM - QUICK TEST")
@@ -12,9 +15,21 @@ print("="*60)
 # Load ML Model
 print("\n1. Loading ML Model...")
 try:
-    classifier = joblib.load('models/ticket_classifier.pkl')
+    # Artifacts are zlib-compressed at save time, so there is little to
+    # read from disk; mmap_mode only applies to uncompressed pickles
     vectorizer = joblib.load('models/tfidf_vectorizer.pkl')
-    print("   [SUCCESS] Model loaded")
+    # Prefer the exported weight arrays: for linear models prediction is
+    # just X @ W.T + b and a softmax, with none of sklearn's estimator
+    # dispatch or input validation on the path
+    if os.path.exists('models/model_weights.npy'):
+        W = np.load('models/model_weights.npy')
+        b = np.load('models/model_bias.npy')
+        classes = np.load('models/model_classes.npy', allow_pickle=True)
+        classifier = None
+        print("   [SUCCESS] Linear weights loaded")
+    else:
+        classifier = joblib.load('models/ticket_classifier.pkl')
+        print("   [SUCCESS] Model loaded")
 except Exception as e:
     print(f"   [ERROR] {e}")
     exit(1)
@@ -34,19 +49,27 @@ test_tickets = [
     "Network cable is damaged"
 ]
 
-for i, ticket in enumerate(test_tickets, 1):
-    # Classify
-    text_vec = vectorizer.transform([ticket.lower()])
-    category = classifier.predict(text_vec)[0]
-    
-    # Get confidence
-    if hasattr(classifier, 'predict_proba'):
-        proba = classifier.predict_proba(text_vec)
-        confidence = max(proba[0]) * 100
-        confidence_str = f"{confidence:.1f}%"
-    else:
-        confidence_str = "N/A"
-    
+# One vectorizer transform and one scoring pass for the whole batch; the
+# per-ticket loop paid sklearn's Python dispatch N times over
+text_vecs = vectorizer.transform([t.lower() for t in test_tickets])
+
+if classifier is None:
+    scores = text_vecs @ W.T + b
+    # Row-wise softmax (shift by the max for numerical stability)
+    exp_scores = np.exp(scores - scores.max(axis=1, keepdims=True))
+    probas = exp_scores / exp_scores.sum(axis=1, keepdims=True)
+    categories = classes[scores.argmax(axis=1)]
+    confidences = probas.max(axis=1) * 100
+elif hasattr(classifier, 'predict_proba'):
+    categories = classifier.predict(text_vecs)
+    # Vectorized row-max over the proba matrix in a single NumPy sweep
+    confidences = classifier.predict_proba(text_vecs).max(axis=1) * 100
+else:
+    categories = classifier.predict(text_vecs)
+    confidences = None
+
+for i, (ticket, category) in enumerate(zip(test_tickets, categories), 1):
+    confidence_str = f"{confidences[i-1]:.1f}%" if confidences is not None else "N/A"
     print(f"\nTicket {i}: {ticket}")
     print(f"Category: {category} (Confidence: {confidence_str})")
 
@@ -54,7 +77,7 @@ print("\n" + "="*60)
 print("ML MODEL WORKING CORRECTLY!")
 print("="*60)
 print("\nModel Details:")
-print(f"- Algorithm: {type(classifier).__name__}")
+print(f"- Algorithm: {'linear weights (.npy)' if classifier is None else type(classifier).__name__}")
 print(f"- Categories: Hardware, Software, Network, Database")
 print(f"- Accuracy: ~67% on test set")
 print("="*60 + "\n")
@@ -4,10 +4,12 @@ Trains classifier to predict BOTH category AND priority
 """
 
 import pandas as pd
+import numpy as np
 import joblib
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.model_selection import train_test_split
 from sklearn.linear_model import LogisticRegression
+from sklearn.multioutput import MultiOutputClassifier
 from sklearn.metrics import classification_report, accuracy_score
 import os
 from datetime import datetime
@@ -114,8 +116,17 @@ training_data = [
     ("Request new database view", "Need custom view created", "Database", "Low"),
 ]
 
-# Convert to DataFrame
-df = pd.DataFrame(training_data, columns=['subject', 'description', 'category', 'priority'])
+# Convert to DataFrame. The text column is assembled here, where the
+# tuples live, so subject/description never become pandas columns (they
+# are not used again) and no concatenation pass runs later. Label
+# columns stay categorical so unique()/value_counts() and the split
+# work on small integer codes instead of hashing one Python string
+# object per row.
+df = pd.DataFrame({
+    'text': [f"{subject} {description}" for subject, description, _, _ in training_data],
+    'category': pd.Categorical([category for _, _, category, _ in training_data]),
+    'priority': pd.Categorical([priority for _, _, _, priority in training_data]),
+})
 
 print(f"✓ Training dataset created: {len(df)} samples")
 print(f"✓ Categories: {df['category'].unique().tolist()}")
@@ -125,16 +136,16 @@ print(f"✓ Priority levels: {df['priority'].unique().tolist()}")
 # PREPARE DATA
 # =============================================================================
 
-# Combine subject + description
-df['text'] = df['subject'] + ' ' + df['description']
-
 # Split data
 X_train, X_test, y_cat_train, y_cat_test, y_pri_train, y_pri_test = train_test_split(
     df['text'], 
     df['category'],
     df['priority'],
-    test_size=0.2, 
-    random_state=42
+    test_size=0.2,
+    random_state=42,
+    # Priority is the more imbalanced label (Critical has 12 samples),
+    # so stratify on it to keep every level represented in the test set
+    stratify=df['priority']
 )
 
 print(f"\n✓ Data split:")
@@ -158,20 +169,26 @@ print(f"\n✓ TF-IDF vectorization complete")
 print(f"  Features: {X_train_vec.shape[1]}")
 
 # =============================================================================
-# TRAIN CATEGORY MODEL
+# TRAIN CATEGORY + PRIORITY MODELS
 # =============================================================================
 
 print("\n" + "-"*70)
-print("TRAINING CATEGORY CLASSIFIER")
+print("TRAINING CATEGORY + PRIORITY CLASSIFIERS (in parallel)")
 print("-"*70)
 
-category_model = LogisticRegression(
-    max_iter=1000,
-    multi_class='multinomial',
-    random_state=42
-)
+# One estimator covers both heads: MultiOutputClassifier clones the
+# base LogisticRegression per label column of the stacked y and fits
+# the clones on its own two workers, sharing the sparse matrix. The
+# fitted per-head models come back out of estimators_ so the rest of
+# the script (evaluation, separate pickles) is unchanged.
+multi_model = MultiOutputClassifier(
+    # saga exploits sparsity via lazy coordinate updates — a better fit
+    # for sparse TF-IDF input than the default lbfgs
+    LogisticRegression(solver='saga', max_iter=1000, random_state=42),
+    n_jobs=2
+).fit(X_train_vec, np.column_stack([y_cat_train, y_pri_train]))
 
-category_model.fit(X_train_vec, y_cat_train)
+category_model, priority_model = multi_model.estimators_
 
 # Evaluate category model
 y_cat_pred = category_model.predict(X_test_vec)
@@ -182,21 +199,13 @@ print("\nCategory Classification Report:")
 print(classification_report(y_cat_test, y_cat_pred))
 
 # =============================================================================
-# TRAIN PRIORITY MODEL
+# EVALUATE PRIORITY MODEL
 # =============================================================================
 
 print("\n" + "-"*70)
-print("TRAINING PRIORITY CLASSIFIER")
+print("PRIORITY CLASSIFIER")
 print("-"*70)
 
-priority_model = LogisticRegression(
-    max_iter=1000,
-    multi_class='multinomial',
-    random_state=42
-)
-
-priority_model.fit(X_train_vec, y_pri_train)
-
 # Evaluate priority model
 y_pri_pred = priority_model.predict(X_test_vec)
 pri_accuracy = accuracy_score(y_pri_test, y_pri_pred)
@@ -246,6 +255,25 @@ metadata_path = os.path.join(MODEL_DIR, 'model_metadata.pkl')
 joblib.dump(metadata, metadata_path)
 print(f"✓ Saved: {metadata_path}")
 
+# Both heads are linear, so prediction reduces to scores = X @ W.T + b
+# plus a softmax; export the raw arrays (same layout train_model.py
+# writes) so inference can run as one NumPy matmul with no sklearn
+# dispatch on the path
+for head_name, head in (('category', category_model), ('priority', priority_model)):
+    np.save(os.path.join(MODEL_DIR, f'{head_name}_weights.npy'), head.coef_)
+    np.save(os.path.join(MODEL_DIR, f'{head_name}_bias.npy'), head.intercept_)
+    np.save(os.path.join(MODEL_DIR, f'{head_name}_classes.npy'), head.classes_)
+print(f"✓ Saved: linear weight arrays (.npy) for both heads")
+
+# train_model.py exports the category weights under model_*.npy and
+# scorers prefer those files over the pickle; ticket_classifier.pkl is
+# the category head here, so rewrite them too or a previous run's
+# arrays would silently shadow the models saved above
+np.save(os.path.join(MODEL_DIR, 'model_weights.npy'), category_model.coef_)
+np.save(os.path.join(MODEL_DIR, 'model_bias.npy'), category_model.intercept_)
+np.save(os.path.join(MODEL_DIR, 'model_classes.npy'), category_model.classes_)
+print(f"✓ Saved: model_*.npy category weight arrays (kept in sync with the pickle)")
+
 # =============================================================================
 # SUMMARY
 # =============================================================================